@@ -0,0 +1,96 @@
+import numpy as np
+
+# Grade ranges for distribution, lowest bin first
+grade_ranges = ['<50', '50-54', '55-59', '60-63', '64-67', '68-71', '72-75', '76-79', '80-84', '85-89', '90-100']
+
+# Percentage edges of each bin: bin i covers [bin_edges[i], bin_edges[i + 1]).
+# Grades are whole numbers, so inner edges sit halfway between bins.
+bin_edges = np.array([0, 49.5, 54.5, 59.5, 63.5, 67.5, 71.5, 75.5, 79.5, 84.5, 89.5, 100], dtype=np.float64)
+
+def weighted_mean(group_ids, n_groups, values, weights):
+    """
+    Weighted mean of values per group, 0 for groups with no weight.
+    """
+    totals = np.bincount(group_ids, weights=weights, minlength=n_groups)
+    sums = np.bincount(group_ids, weights=values * weights, minlength=n_groups)
+    return np.divide(sums, totals, out=np.zeros(n_groups), where=totals > 0)
+
+def histogram_quantiles(bins, lows, highs, q):
+    """
+    Interpolates the q-th quantile of every row of a (groups x bins) count
+    matrix, assuming grades are spread evenly within each bin. The outer
+    edges are tightened to each group's lowest and highest grade.
+    """
+    bins = np.asarray(bins, dtype=np.float64)
+    lower = np.clip(bin_edges[None, :-1], lows[:, None], highs[:, None])
+    upper = np.clip(bin_edges[None, 1:], lows[:, None], highs[:, None])
+
+    cumulative = np.cumsum(bins, axis=1)
+    target = q * cumulative[:, -1]
+    # First bin whose running count reaches the target
+    idx = np.minimum((cumulative < target[:, None]).sum(axis=1), bins.shape[1] - 1)
+
+    rows = np.arange(bins.shape[0])
+    before = cumulative[rows, idx] - bins[rows, idx]
+    frac = np.divide(target - before, bins[rows, idx],
+                     out=np.zeros(bins.shape[0]), where=bins[rows, idx] > 0)
+    return lower[rows, idx] + frac * (upper[rows, idx] - lower[rows, idx])
+
+def pool_sections(group_ids, n_groups, reported, average, median, p25, p75, high, low, bins):
+    """
+    Pools per-section statistics into per-group statistics in one pass.
+    Parameters:
+        group_ids: Group index (0..n_groups-1) of every section
+        reported, average, median, p25, p75, high, low: Per-section arrays
+        bins: (sections x len(grade_ranges)) grade distribution counts
+    Returns:
+        Dictionary of per-group arrays. Averages are enrolment-weighted;
+        median and percentiles are read off the pooled histogram, falling
+        back to enrolment-weighted section values for single-section groups
+        and groups whose bins are incomplete.
+    """
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    reported = np.asarray(reported, dtype=np.float64)
+    bins = np.asarray(bins, dtype=np.float64).reshape(len(group_ids), len(grade_ranges))
+
+    pooled_bins = np.zeros((n_groups, len(grade_ranges)))
+    np.add.at(pooled_bins, group_ids, bins)
+
+    pooled_high = np.full(n_groups, -np.inf)
+    pooled_low = np.full(n_groups, np.inf)
+    np.maximum.at(pooled_high, group_ids, np.asarray(high, dtype=np.float64))
+    np.minimum.at(pooled_low, group_ids, np.asarray(low, dtype=np.float64))
+
+    # Sections that report no bounds leave the full bin range available
+    bounds_missing = (pooled_high < pooled_low) | (pooled_high <= 0)
+    hist_high = np.where(bounds_missing, bin_edges[-1], pooled_high)
+    hist_low = np.where(bounds_missing, bin_edges[0], pooled_low)
+    pooled_reported = np.bincount(group_ids, weights=reported, minlength=n_groups)
+    # A lone section already reports its exact quantiles, and suppressed bins
+    # leave the histogram short of the enrolment; only interpolate when
+    # several sections are pooled and the bins account for every grade
+    graded = reported > 0
+    graded_sections = np.bincount(group_ids[graded], minlength=n_groups)
+    has_bins = (graded_sections > 1) & (pooled_bins.sum(axis=1) > 0) & (pooled_bins.sum(axis=1) >= pooled_reported)
+
+    stats = {
+        "reported": pooled_reported,
+        "average": weighted_mean(group_ids, n_groups, np.asarray(average, dtype=np.float64), reported),
+        "high": np.where(np.isfinite(pooled_high), pooled_high, 0),
+        "low": np.where(np.isfinite(pooled_low), pooled_low, 0),
+        "bins": pooled_bins,
+    }
+    for key, q, values in [("percentile25", 0.25, p25), ("median", 0.5, median), ("percentile75", 0.75, p75)]:
+        values = np.asarray(values, dtype=np.float64)
+        fallback = weighted_mean(group_ids, n_groups, values, reported)
+
+        # A pooled quantile lies between the smallest and largest section quantile
+        section_min = np.full(n_groups, np.inf)
+        section_max = np.full(n_groups, -np.inf)
+        np.minimum.at(section_min, group_ids[graded], values[graded])
+        np.maximum.at(section_max, group_ids[graded], values[graded])
+
+        interpolated = histogram_quantiles(pooled_bins, hist_low, hist_high, q)
+        interpolated = np.clip(interpolated, section_min, section_max)
+        stats[key] = np.where(has_bins, interpolated, fallback)
+    return stats
@@ -0,0 +1,117 @@
+import os
+import json
+import numpy as np
+from pooled_stats import grade_ranges
+
+# Paths
+input_dir = "data/course-data/post-processed"
+output_dir = "data/course-data/similar-courses"
+
+# Number of neighbours kept per course and rows scored per matrix product
+top_k = 10
+block_size = 512
+
+# Courses whose bins hold less than this share of Reported are left out
+min_coverage = 0.8
+
+def build_histogram_matrix(courses):
+    """
+    Builds the normalized (courses x bins) histogram matrix for one term.
+    Rows are divided by Reported and square-rooted, so a dot product between
+    two rows is the Bhattacharyya coefficient over the visible bins only:
+    grades hidden by small-cell suppression never count as a match, and a
+    partial histogram scores below 1.0 even against itself.
+    Courses whose bins cover less than min_coverage of Reported are dropped.
+    """
+    counts = np.array([[c.get(r, 0) for r in grade_ranges] for c in courses], dtype=np.float64)
+    # np.array([]) is 1-D, so give empty terms their bin axis back
+    counts = counts.reshape(-1, len(grade_ranges))
+    binned = counts.sum(axis=1)
+    reported = np.maximum(np.array([c.get("Reported", 0) for c in courses], dtype=np.float64), binned)
+
+    keep = (binned > 0) & (binned >= min_coverage * reported)
+    matrix = np.sqrt(counts[keep] / reported[keep, None])
+    codes = [c["Code"] for c, k in zip(courses, keep) if k]
+    averages = np.array([c.get("Average", 0) for c, k in zip(courses, keep) if k], dtype=np.float64)
+    return codes, matrix, averages
+
+def rank_candidates(sims, gaps, candidates, k):
+    """
+    Orders candidate columns by rounded score, then Average gap, then
+    position, and keeps the first k.
+    """
+    keys = (candidates,
+            np.take_along_axis(gaps, candidates, axis=1),
+            -np.round(np.take_along_axis(sims, candidates, axis=1), 4))
+    order = np.lexsort(keys, axis=-1)
+    return np.take_along_axis(candidates, order, axis=1)[:, :k]
+
+def nearest_neighbours(matrix, averages, k):
+    """
+    Returns (indices, scores) of the k most similar rows for every row,
+    computed one block of rows at a time so memory stays at block_size x n.
+    Equal scores (at the stored precision) are ordered by the difference
+    in Average, then by position, so the index is deterministic.
+    """
+    n = matrix.shape[0]
+    k = max(min(k, n - 1), 0)
+    indices = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float64)
+    if k <= 0:
+        return indices, scores
+
+    # Only a few times k candidates per row go through the tie-break sort
+    n_candidates = min(4 * k, n - 1)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        rows = np.arange(stop - start)
+        sims = matrix[start:stop] @ matrix.T
+        # A course is never its own neighbour
+        sims[rows, np.arange(start, stop)] = -np.inf
+        gaps = np.abs(averages[start:stop, None] - averages[None, :])
+
+        candidates = np.argpartition(-sims, n_candidates - 1, axis=1)[:, :n_candidates]
+        top = rank_candidates(sims, gaps, candidates, k)
+
+        # Ties at the k-th score may spill past the candidate set; rank those
+        # rows over every column instead
+        rounded = np.round(np.take_along_axis(sims, candidates, axis=1), 4)
+        spilled = (n_candidates < n - 1) & (np.round(sims[rows, top[:, -1]], 4) <= rounded.min(axis=1))
+        if spilled.any():
+            everything = np.broadcast_to(np.arange(n), (int(spilled.sum()), n))
+            top[spilled] = rank_candidates(sims[spilled], gaps[spilled], everything, k)
+
+        indices[start:stop] = top
+        scores[start:stop] = np.take_along_axis(sims, top, axis=1)
+
+    return indices, scores
+
+def process_term(campus, term_file):
+    with open(os.path.join(input_dir, campus, term_file)) as f:
+        courses = json.load(f)
+
+    codes, matrix, averages = build_histogram_matrix(courses)
+    indices, scores = nearest_neighbours(matrix, averages, top_k)
+
+    # Compact index: course code -> [[neighbour code, similarity], ...]
+    index = {
+        code: [[codes[j], round(float(s), 4)] for j, s in zip(indices[i], scores[i])]
+        for i, code in enumerate(codes)
+    }
+
+    os.makedirs(os.path.join(output_dir, campus), exist_ok=True)
+    with open(os.path.join(output_dir, campus, term_file), "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    print(f"✅ {campus} {os.path.splitext(term_file)[0]}: {len(codes)} courses indexed")
+
+for campus in ["UBCV", "UBCO"]:
+    campus_dir = os.path.join(input_dir, campus)
+    if not os.path.isdir(campus_dir):
+        print(f"[!] Skipping {campus}: no post-processed data")
+        continue
+    for term_file in sorted(os.listdir(campus_dir)):
+        if term_file.endswith(".json"):
+            process_term(campus, term_file)
+
+print("✅ Similar course index built.")
@@ -3,13 +3,13 @@ import json
 import pandas as pd
 import re
 from collections import defaultdict
+from pooled_stats import pool_sections, grade_ranges
 
 # Grade mapping: letter to percentage bin
 grade_map = {
     "A+": "90-100", "A": "85-89", "A-": "80-84", "B+": "76-79", "B": "72-75",
     "B-": "68-71", "C+": "64-67", "C": "60-63", "C-": "55-59", "D": "50-54", "F": "<50"
 }
-grade_ranges = list(grade_map.values())
 
 # Paths
 base_dir = "data/course-data/pre-processed"
@@ -65,12 +65,10 @@ def process_2024(campus, subjects):
 
         grouped = defaultdict(lambda: {
             "Subject": "", "Code": "", "Name": "", "Faculty": "",
-            "AverageSum": 0, "Reported": 0,
-            "WeightedMedian": 0, "Percentile25": 0, "Percentile75": 0,
-            "Highs": [], "Lows": [],
-            "Professors": set(),
-            **{g: 0 for g in grade_ranges}
+            "Professors": set()
         })
+        group_index = {}
+        sections = defaultdict(list)
 
         for _, row in df_course.iterrows():
             code = row["Course"]
@@ -93,13 +91,6 @@ def process_2024(campus, subjects):
             g = grouped[key]
             g["Code"] = code
             g["Name"] = title
-            g["Reported"] += reported
-            g["AverageSum"] += mean * reported
-            g["WeightedMedian"] += median * reported
-            g["Percentile25"] += p25 * reported
-            g["Percentile75"] += p75 * reported
-            g["Highs"].append(high)
-            g["Lows"].append(low)
             g["Professors"].update(professors)
 
             subject_info = next((x for x in subjects if x["code"] == subject), None)
@@ -115,27 +106,46 @@ def process_2024(campus, subjects):
                 (df_grade["Section"] == row["Section"]) &
                 (df_grade["Course Title"] == title)
             ]
+            dist = {rng: 0 for rng in grade_ranges}
             if not grade_match.empty:
                 grade_row = grade_match.iloc[0]
                 for letter, rng in grade_map.items():
-                    g[rng] += int(grade_row.get(letter, 0))
+                    dist[rng] += int(grade_row.get(letter, 0))
+
+            sections["group"].append(group_index.setdefault(key, len(group_index)))
+            sections["reported"].append(reported)
+            sections["mean"].append(mean)
+            sections["median"].append(median)
+            sections["p25"].append(p25)
+            sections["p75"].append(p75)
+            sections["high"].append(high)
+            sections["low"].append(low)
+            sections["bins"].append([dist[rng] for rng in grade_ranges])
+
+        # Pool section statistics for every course at once
+        stats = pool_sections(
+            sections["group"], len(group_index),
+            sections["reported"], sections["mean"], sections["median"],
+            sections["p25"], sections["p75"], sections["high"], sections["low"],
+            sections["bins"]
+        )
 
         output = []
-        for g in grouped.values():
-            total = g["Reported"]
+        for key, g in grouped.items():
+            i = group_index[key]
             record = {
                 "Subject": g["Subject"],
                 "Code": g["Code"],
                 "Name": g["Name"],
                 "Faculty": g["Faculty"],
-                "Average": round(g["AverageSum"] / total, 2) if total else 0,
-                "Reported": total,
-                "WeightedMedian": round(g["WeightedMedian"] / total, 2) if total else 0,
-                "Percentile25": round(g["Percentile25"] / total, 2) if total else 0,
-                "Percentile75": round(g["Percentile75"] / total, 2) if total else 0,
-                "High": max(g["Highs"]) if g["Highs"] else 0,
-                "Low": min(g["Lows"]) if g["Lows"] else 0,
-                **{k: g[k] for k in grade_ranges}
+                "Average": round(float(stats["average"][i]), 2),
+                "Reported": int(stats["reported"][i]),
+                "WeightedMedian": round(float(stats["median"][i]), 2),
+                "Percentile25": round(float(stats["percentile25"][i]), 2),
+                "Percentile75": round(float(stats["percentile75"][i]), 2),
+                "High": float(stats["high"][i]),
+                "Low": float(stats["low"][i]),
+                **{rng: int(stats["bins"][i, j]) for j, rng in enumerate(grade_ranges)}
             }
             if g["Professors"]:
                 record["Professors"] = sorted(g["Professors"])
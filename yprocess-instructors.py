@@ -2,6 +2,7 @@ import os
 import json
 import pandas as pd
 from collections import defaultdict
+from pooled_stats import pool_sections
 
 base_path = "data/course-data/pre-processed"
 output_path = "data/instructor-data"
@@ -40,24 +41,41 @@ def safe_read_tsv(path):
     except:
         return pd.read_csv(path, sep="\t", encoding="utf-8").fillna(0)
 
-def combine_course_sections(sections):
-    total = sum(s['reported'] for s in sections)
-    if total == 0:
-        return None
-    out = {
-        "section": ", ".join(sorted(set(s["section"] for s in sections))),
-        "reported": total,
-        "title": sections[0]["title"],
-        "average": round(sum(s["average"] * s["reported"] for s in sections) / total, 2),
-        "median": round(sum(s["median"] * s["reported"] for s in sections) / total, 2),
-        "percentile25": round(sum(s["percentile25"] * s["reported"] for s in sections) / total, 2),
-        "percentile75": round(sum(s["percentile75"] * s["reported"] for s in sections) / total, 2),
-        "high": max(s["high"] for s in sections),
-        "low": min(s["low"] for s in sections)
-    }
-    for r in grade_ranges:
-        out[r] = sum(s[r] for s in sections)
-    return out
+def combine_course_sections(course_sections):
+    columns = defaultdict(list)
+    for i, sections in enumerate(course_sections):
+        for s in sections:
+            columns["group"].append(i)
+            for key in ["reported", "average", "median", "percentile25", "percentile75", "high", "low"]:
+                columns[key].append(s[key])
+            columns["bins"].append([s[r] for r in grade_ranges])
+
+    stats = pool_sections(
+        columns["group"], len(course_sections),
+        columns["reported"], columns["average"], columns["median"],
+        columns["percentile25"], columns["percentile75"], columns["high"], columns["low"],
+        columns["bins"]
+    )
+    combined = []
+    for i, sections in enumerate(course_sections):
+        if stats["reported"][i] == 0:
+            combined.append(None)
+            continue
+        out = {
+            "section": ", ".join(sorted(set(s["section"] for s in sections))),
+            "reported": int(stats["reported"][i]),
+            "title": sections[0]["title"],
+            "average": round(float(stats["average"][i]), 2),
+            "median": round(float(stats["median"][i]), 2),
+            "percentile25": round(float(stats["percentile25"][i]), 2),
+            "percentile75": round(float(stats["percentile75"][i]), 2),
+            "high": int(stats["high"][i]),
+            "low": int(stats["low"][i])
+        }
+        for j, r in enumerate(grade_ranges):
+            out[r] = int(stats["bins"][i, j])
+        combined.append(out)
+    return combined
 
 def process_term(campus, term):
     folder = os.path.join(base_path, campus, term)
@@ -132,15 +150,19 @@ def process_term(campus, term):
             instructors[prof]["faculties"].add(get_faculty(subject, campus))
             instructors[prof]["courses"][course_code].append(section_data)
 
+    # Combine the sections of every instructor's courses in one pass
+    keys = [(name, ccode) for name, info in instructors.items() for ccode in info["courses"]]
+    pooled = combine_course_sections([instructors[name]["courses"][ccode] for name, ccode in keys])
+    courses_by_instructor = defaultdict(list)
+    for (name, ccode), comb in zip(keys, pooled):
+        if comb:
+            comb["code"] = ccode
+            comb["subject"] = instructors[name]["courses"][ccode][0]["subject"]
+            courses_by_instructor[name].append(comb)
+
     output = []
     for name, info in instructors.items():
-        combined = []
-        for ccode, sections in info["courses"].items():
-            comb = combine_course_sections(sections)
-            if comb:
-                comb["code"] = ccode
-                comb["subject"] = sections[0]["subject"]
-                combined.append(comb)
+        combined = courses_by_instructor[name]
         total_students = sum(c["reported"] for c in combined)
         if total_students == 0:
             continue
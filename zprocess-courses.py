@@ -3,6 +3,7 @@ import glob
 import os
 import json
 import re
+from pooled_stats import pool_sections
 
 # Paths
 root_folder = "course-data/pre-processed"
@@ -100,31 +101,31 @@ for campus_folder, subjects, output_campus_folder in [
 
         df_all = pd.concat(data, ignore_index=True)
 
-        # Calculate weighted values for each course
-        df_all['WeightedGrade'] = df_all['Avg'] * df_all['Reported']
-        df_all['WeightedMedian'] = df_all['Median'] * df_all['Reported']
-        df_all['WeightedP25'] = df_all['Percentile (25)'] * df_all['Reported']
-        df_all['WeightedP75'] = df_all['Percentile (75)'] * df_all['Reported']
+        # Rows without a Subject or Course have no group, as in groupby's default dropna
+        df_all = df_all[df_all['Subject'].notna() & df_all['Course'].notna()]
 
         # Group by Subject and Course
-        final_grouped = df_all.groupby(['Subject', 'Course'], as_index=False).agg(
+        grouped = df_all.groupby(['Subject', 'Course'], as_index=False)
+        final_grouped = grouped.agg(
             title=('Title', 'first'),
             professors=('Professor', lambda x: list(x.dropna().unique())),
-            reported=('Reported', 'sum'),
-            weighted_sum=('WeightedGrade', 'sum'),
-            weighted_median_sum=('WeightedMedian', 'sum'),
-            weighted_p25_sum=('WeightedP25', 'sum'),
-            weighted_p75_sum=('WeightedP75', 'sum'),
-            high=('High', 'max'),
-            low=('Low', 'min'),
-            **{range_: (range_, 'sum') for range_ in grade_ranges}
         )
 
-        # Calculate weighted statistics with full precision
-        final_grouped['avg'] = final_grouped['weighted_sum'] / final_grouped['reported']
-        final_grouped['weighted_median'] = final_grouped['weighted_median_sum'] / final_grouped['reported']
-        final_grouped['weighted_p25'] = final_grouped['weighted_p25_sum'] / final_grouped['reported']
-        final_grouped['weighted_p75'] = final_grouped['weighted_p75_sum'] / final_grouped['reported']
+        # Pool section statistics for every course at once
+        stats = pool_sections(
+            grouped.ngroup().to_numpy(), len(final_grouped),
+            df_all['Reported'].to_numpy(), df_all['Avg'].to_numpy(), df_all['Median'].to_numpy(),
+            df_all['Percentile (25)'].to_numpy(), df_all['Percentile (75)'].to_numpy(),
+            df_all['High'].to_numpy(), df_all['Low'].to_numpy(), df_all[grade_ranges].to_numpy()
+        )
+        final_grouped['reported'] = stats['reported']
+        final_grouped['avg'] = stats['average']
+        final_grouped['median'] = stats['median']
+        final_grouped['p25'] = stats['percentile25']
+        final_grouped['p75'] = stats['percentile75']
+        final_grouped['high'] = stats['high']
+        final_grouped['low'] = stats['low']
+        final_grouped[grade_ranges] = stats['bins']
 
         # Add faculty and campus data
         for idx, row in final_grouped.iterrows():
@@ -146,9 +147,9 @@ for campus_folder, subjects, output_campus_folder in [
                     "Faculty": faculty,
                     "Average": round(row['avg'], 2),
                     "Reported": int(row['reported']),
-                    "WeightedMedian": round(row['weighted_median'], 2),
-                    "Percentile25": round(row['weighted_p25'], 2),
-                    "Percentile75": round(row['weighted_p75'], 2),
+                    "WeightedMedian": round(row['median'], 2),
+                    "Percentile25": round(row['p25'], 2),
+                    "Percentile75": round(row['p75'], 2),
                     "High": int(row['high']),
                     "Low": int(row['low']),
                     **{range_: int(row[range_]) for range_ in grade_ranges},
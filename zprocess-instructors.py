@@ -3,6 +3,7 @@ import glob
 import os
 import json
 from collections import defaultdict
+from pooled_stats import pool_sections
 
 # Paths setup remains the same
 root_folder = "course-data/pre-processed"
@@ -25,52 +26,59 @@ def get_faculty_for_subject(subject_code, subjects):
         return subject_info["faculty_school"], subject_info["title"]
     return "Unknown Faculty", subject_code
 
-def combine_course_sections(sections):
+def combine_course_sections(course_sections):
     """
-    Combines multiple sections of the same course.
+    Combines multiple sections of many courses in one pooled pass.
     Parameters:
-        sections: List of dictionaries containing section data
+        course_sections: List of section lists, one per course
     Returns:
-        Dictionary with combined statistics
+        List with a dictionary of combined statistics per course,
+        or None for courses without any reported grades
     """
-    total_students = sum(section['reported'] for section in sections)
-    if total_students == 0:
-        return None
-
-    # Convert sections to strings before joining
-    all_sections = sorted(set(str(section['section']) for section in sections))
-    combined_sections = ", ".join(all_sections)
-
-    # Initialize combined data
-    combined = {
-        "section": combined_sections,
-        "reported": total_students,
-        "title": sections[0]['title'],  # Use title from first section
-    }
-
-    # Calculate weighted average
-    weighted_sum = sum(section['average'] * section['reported'] for section in sections)
-    combined['average'] = round(weighted_sum / total_students, 2)
-
-    # Calculate weighted median
-    weighted_median_sum = sum(section['median'] * section['reported'] for section in sections)
-    combined['median'] = round(weighted_median_sum / total_students, 2)
-
-    # Calculate weighted percentiles
-    weighted_p25_sum = sum(section['percentile25'] * section['reported'] for section in sections)
-    weighted_p75_sum = sum(section['percentile75'] * section['reported'] for section in sections)
-    combined['percentile25'] = round(weighted_p25_sum / total_students, 2)
-    combined['percentile75'] = round(weighted_p75_sum / total_students, 2)
-
-    # Take the maximum high and minimum low across all sections
-    combined['high'] = max(section['high'] for section in sections)
-    combined['low'] = min(section['low'] for section in sections)
-
-    # Sum up the grade distributions
-    for grade_range in grade_ranges:
-        combined[grade_range] = sum(section[grade_range] for section in sections)
-
-    return combined
+    # Gather every section's values, remembering which course it belongs to
+    columns = defaultdict(list)
+    for i, sections in enumerate(course_sections):
+        for section in sections:
+            columns['group'].append(i)
+            for key in ['reported', 'average', 'median', 'percentile25', 'percentile75', 'high', 'low']:
+                columns[key].append(section[key])
+            columns['bins'].append([section[grade_range] for grade_range in grade_ranges])
+
+    stats = pool_sections(
+        columns['group'], len(course_sections),
+        columns['reported'], columns['average'], columns['median'],
+        columns['percentile25'], columns['percentile75'], columns['high'], columns['low'],
+        columns['bins']
+    )
+
+    all_combined = []
+    for i, sections in enumerate(course_sections):
+        if stats['reported'][i] == 0:
+            all_combined.append(None)
+            continue
+
+        # Convert sections to strings before joining
+        all_sections = sorted(set(str(section['section']) for section in sections))
+
+        combined = {
+            "section": ", ".join(all_sections),
+            "reported": int(stats['reported'][i]),
+            "title": sections[0]['title'],  # Use title from first section
+            "average": round(float(stats['average'][i]), 2),
+            "median": round(float(stats['median'][i]), 2),
+            "percentile25": round(float(stats['percentile25'][i]), 2),
+            "percentile75": round(float(stats['percentile75'][i]), 2),
+            "high": int(stats['high'][i]),
+            "low": int(stats['low'][i])
+        }
+
+        # Pooled grade distribution
+        for j, grade_range in enumerate(grade_ranges):
+            combined[grade_range] = int(stats['bins'][i, j])
+
+        all_combined.append(combined)
+
+    return all_combined
 
 def process_professor_data(df, subjects):
     df_expanded = df[df['Professor'].notnull()].copy()  # Only process rows with non-null Professor
@@ -119,17 +127,21 @@ def process_professor_data(df, subjects):
             # Add to the list of sections for this course
             professors_data[professor]["courses"][course_code].append(section_data)
 
+    # Combine sections for every professor's courses at once
+    keys = [(professor, course_code) for professor, data in professors_data.items() for course_code in data["courses"]]
+    all_combined = combine_course_sections([professors_data[p]["courses"][c] for p, c in keys])
+    courses_by_professor = defaultdict(list)
+    for (professor, course_code), combined in zip(keys, all_combined):
+        if combined:
+            sections = professors_data[professor]["courses"][course_code]
+            combined["code"] = course_code
+            combined["subject"] = sections[0]["subject"]  # Use subject from first section
+            courses_by_professor[professor].append(combined)
+
     # Process the grouped data
     final_professors_data = []
     for professor, data in professors_data.items():
-        # Combine sections for each course
-        combined_courses = []
-        for course_code, sections in data["courses"].items():
-            combined = combine_course_sections(sections)
-            if combined:
-                combined["code"] = course_code
-                combined["subject"] = sections[0]["subject"]  # Use subject from first section
-                combined_courses.append(combined)
+        combined_courses = courses_by_professor[professor]
 
         # Calculate professor's overall statistics
         total_students = sum(course["reported"] for course in combined_courses)